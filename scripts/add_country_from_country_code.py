@@ -1,115 +1,151 @@
 #!/usr/bin/env python3
 
+# Add src as a package
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
 import argparse
 from pathlib import Path
 import duckdb
+from src.utils import configure_duckdb, add_duckdb_arguments, sql_string
 
 default_iso_code_column = "ISO_country_code"
 default_country_column = "country"
 table_name = "input"
 country_codes_remote_csv = "https://raw.githubusercontent.com/datasets/country-codes/master/data/country-codes.csv"
+# Columns added to the input table and the lookup expression used to populate them
+country_columns = {
+    "country": "cc.amr_name",
+    "geographical_region": 'un."Region Name"',
+    "geographical_subregion": 'un."Sub-region Name"',
+}
+# Supported CSV extensions and the DuckDB compression used for each
+csv_compression = {
+    ".csv": "none",
+    ".csv.gz": "gzip",
+    ".csv.zst": "zstd",
+}
+
+
+def file_format(path: str | Path) -> tuple[str, str | None]:
+    """Returns the format and compression to use for a path based on its suffix"""
+    name = str(path).lower()
+    if name.endswith(".parquet"):
+        return ("parquet", None)
+    for suffix, compression in csv_compression.items():
+        if name.endswith(suffix):
+            return ("csv", compression)
+    raise ValueError(
+        f"Do not understand the format extension in the file {path}. Try .parquet, {', '.join(csv_compression)}"
+    )
 
 
 def load_duckdb(con, args) -> None:
     con.execute("INSTALL httpfs")
     con.execute("LOAD httpfs")
 
-    if ".csv" in args.input:
+    file_type, compression = file_format(args.input)
+    if file_type == "csv":
         print(f"Loading CSV file {args.input}")
         con.execute(
-            f"create table {table_name} as select * from read_csv(?, sample_size = -1)",
-            [str(args.input)],
+            f"create table {table_name} as select * from read_csv(?, sample_size = -1, compression = ?)",
+            [str(args.input), compression],
         )
-    elif ".parquet" in args.input:
+    else:
         print(f"Loading parquet {args.input}")
         con.execute(
             f"create table {table_name} as select * from read_parquet(?)",
             [str(args.input)],
         )
-    else:
-        raise ValueError(
-            "Provided file does not end in .parquet or .csv or .csv.gz. Not sure how to load"
-        )
-    print(f"Loading country codes table")
+    # Reference tables are small and read once by the join so keep them as views
+    # and compute the cleaned country name inline. Views cannot take bound
+    # parameters so the paths are escaped and interpolated
+    print(f"Loading country codes view")
     con.execute(
-        "create table country_codes as select * from read_csv(?)",
-        [str(args.country_codes)],
-    )
-    print(f"Loading UNSD table")
-    con.execute(
-        "create table unsd as select * from read_csv(?, delim = ';', header = true)",
-        [str(args.unsd)],
-    )
-    print(f"Pre-compute names")
-    con.execute("ALTER TABLE country_codes ADD COLUMN amr_name VARCHAR")
-    con.execute(
-        'UPDATE country_codes SET amr_name = coalesce("UNTERM English Short", "CLDR display name")'
-    )
-    # Remove anything in parentheses from the end of the country name
-    con.execute(
-        "UPDATE country_codes SET amr_name = regexp_replace(amr_name, '\\s\\(.+?\\)', '')"
+        f"""
+CREATE VIEW country_codes AS
+SELECT
+    *,
+    regexp_replace(
+        -- Remove anything in parentheses from the end of the country name
+        regexp_replace(coalesce("UNTERM English Short", "CLDR display name"), '\\s\\(.+?\\)', ''),
+        -- Remove asterisks and extra spaces
+        '\\s\\*+', ''
+    ) AS amr_name
+FROM read_csv('{sql_string(args.country_codes)}')
+"""
     )
-    # Remove asterisks and extra spaces
+    print(f"Loading UNSD view")
     con.execute(
-        "UPDATE country_codes SET amr_name = regexp_replace(amr_name, '\\s\\*+', '')"
+        f"CREATE VIEW unsd AS SELECT * FROM read_csv('{sql_string(args.unsd)}', delim = ';', header = true)"
     )
 
 
 def update(con, args) -> None:
     iso_code_column = args.iso_code_column
     print("Updating country names from country codes")
+    existing_columns = {
+        row[0]
+        for row in con.execute(
+            "SELECT column_name FROM duckdb_columns() WHERE table_name = ?",
+            [table_name],
+        ).fetchall()
+    }
+    drop_columns = args.drop_columns or []
+    exclude = []
     if args.overwrite:
         print(" > Removing country columns if they exist")
-        for column in ("country", "geographical_region", "geographical_subregion"):
-            print(f" > Removing {table_name}.{column} if it exists")
-            con.execute(f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS {column}")
+        for column in country_columns:
+            if column in existing_columns:
+                print(f" > Removing {table_name}.{column}")
+                exclude.append(column)
+    else:
+        clashes = [c for c in country_columns if c in existing_columns]
+        if clashes:
+            raise ValueError(
+                f"Columns {clashes} already exist in {table_name}. Use --overwrite to replace them"
+            )
 
-    con.execute(f"ALTER TABLE {table_name} ADD COLUMN country VARCHAR")  # amr_name
-    con.execute(
-        f"ALTER TABLE {table_name} ADD COLUMN geographical_region VARCHAR"
-    )  # Region Name
-    con.execute(
-        f"ALTER TABLE {table_name} ADD COLUMN geographical_subregion VARCHAR"
-    )  # Sub-region Name
-    con.execute(
-        f"""
-UPDATE {table_name} SET
-country = cc.amr_name
-FROM country_codes cc
-WHERE {table_name}.{iso_code_column} = cc."ISO3166-1-Alpha-3"
-"""
-    )
+    print("Dropping unwanted columns")
+    for col in drop_columns:
+        if col in existing_columns and col not in exclude:
+            print(f"  >> Dropping column {col}")
+            exclude.append(col)
+
+    # Rebuild the table in one pass with both lookups joined in, rather than
+    # adding columns and running an UPDATE per lookup table. The joins do not
+    # keep row order so restore the input's order from its rowid
+    exclude_clause = f" EXCLUDE ({', '.join(exclude)})" if exclude else ""
+    country_selects = [
+        f"{expression} AS {column}"
+        for column, expression in country_columns.items()
+        if column not in drop_columns
+    ]
+    select_list = ",\n    ".join([f"i.*{exclude_clause}"] + country_selects)
     con.execute(
         f"""
-UPDATE {table_name} SET
-geographical_region = un."Region Name",
-geographical_subregion = un."Sub-region Name"
-FROM unsd un
-WHERE {table_name}.{iso_code_column} = un."ISO-alpha3 Code"
+CREATE OR REPLACE TABLE {table_name} AS
+SELECT
+    {select_list}
+FROM {table_name} i
+LEFT JOIN country_codes cc ON i.{iso_code_column} = cc."ISO3166-1-Alpha-3"
+LEFT JOIN unsd un ON i.{iso_code_column} = un."ISO-alpha3 Code"
+ORDER BY i.rowid
 """
     )
-    con.commit()
     print(f"Finished updating country names in {table_name} table")
 
-    print("Dropping unwanted columns")
-    if args.drop_columns:
-        for col in args.drop_columns:
-            print(f"  >> Dropping column {col}")
-            con.execute(f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS {col}")
-    con.commit()
-
 
 def write_to_disk(con, args):
     path = args.output
     print(f"Writing the table {table_name} out to {path}")
-    if ".csv" in str(args.output):
-        options = "FORMAT CSV"
-    elif ".parquet" in str(args.output):
-        options = "FORMAT parquet, COMPRESSION zstd"
+    file_type, compression = file_format(path)
+    if file_type == "csv":
+        options = f"FORMAT CSV, COMPRESSION {compression}"
     else:
-        raise ValueError(
-            f"Do not understand the format extension in the file {path}. Try .csv, .csv.gz or .parquet"
-        )
+        options = "FORMAT parquet, COMPRESSION zstd"
     query = f"""
 COPY
     (SELECT * FROM {table_name})
@@ -172,6 +208,7 @@ def arg_parser():
         action=argparse.BooleanOptionalAction,
         help="Drop country and region columns before population",
     )
+    add_duckdb_arguments(parser)
     return parser
 
 
@@ -179,6 +216,7 @@ def main():
     parser = arg_parser()
     args = parser.parse_args()
     with duckdb.connect() as con:
+        configure_duckdb(con, threads=args.threads, memory_limit=args.memory_limit)
         load_duckdb(con, args)
         update(con, args)
         if not args.dry_run:
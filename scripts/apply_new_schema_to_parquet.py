@@ -9,9 +9,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import argparse
 from pathlib import Path
 from src.schema import load_schema_from_config
+from src.config import parquet
 import pyarrow.parquet as pq
 import pyarrow.compute as pc
 
+batch_size = 65_536
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -39,18 +42,25 @@ def main():
     schema = load_schema_from_config(args.schema)
 
     print(f"Reading parquet: {args.input}")
-    table = pq.read_table(args.input)
+    parquet_file = pq.ParquetFile(args.input)
 
-    if args.filter_null:
-        column_name = args.filter_null
-        if column_name not in table.column_names:
+    column_name = args.filter_null
+    if column_name:
+        if column_name not in parquet_file.schema_arrow.names:
             raise ValueError(f"Column '{column_name}' not found in Parquet file.")
-        mask = pc.invert(pc.is_null(table[column_name]))
         print(f"Filtering rows where {column_name} is null")
-        table = table.filter(mask)
 
-    casted_table = table.cast(schema)
-    pq.write_table(casted_table, args.output)
+    # Stream batches through the filter and cast so only one batch is in memory
+    with pq.ParquetWriter(
+        args.output,
+        schema,
+        compression=parquet["compression"],
+        compression_level=parquet["compression_level"],
+    ) as writer:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            if column_name:
+                batch = batch.filter(pc.is_valid(batch[column_name]))
+            writer.write_batch(batch.cast(schema))
     print(f"✅ New Parquet file written: {args.output}")
 
 
@@ -8,66 +8,69 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import argparse
 from pathlib import Path
-import pyarrow.csv as pv
+from typing import Dict
+import duckdb
 import pyarrow as pa
-import pyarrow.parquet as pq
 import logging
 from src.schema import load_schema_from_config
 from src.config import parquet
+from src.utils import configure_duckdb, add_duckdb_arguments, sql_string
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+csv_null_values = ["", "null", "None", "N/A"]
+
+
+def schema_to_duckdb_types(con, schema: pa.Schema) -> Dict[str, str]:
+    """Translate a pyarrow schema into DuckDB column types by registering an
+    empty table with the schema and asking DuckDB to describe it"""
+    con.register("schema_template", schema.empty_table())
+    try:
+        columns = con.execute("DESCRIBE schema_template").fetchall()
+    finally:
+        con.unregister("schema_template")
+    return {name: column_type for name, column_type, *_ in columns}
+
 
 def convert_csv_to_parquet(
-    input_dir: Path, output_dir: Path, pattern: str, schema: pa.Schema
+    input_dir: Path,
+    merged_file: Path,
+    pattern: str,
+    schema: pa.Schema,
+    threads: int = None,
+    memory_limit: str = None,
 ):
-    output_dir.mkdir(parents=True, exist_ok=True)
-    csv_files = sorted(input_dir.glob(pattern))
+    csv_files = [str(p) for p in sorted(input_dir.glob(pattern))]
     if not csv_files:
         raise FileNotFoundError(
             f"No CSV files found in {input_dir} matching pattern '{pattern}'"
         )
 
     log.info(
-        f"Found {len(csv_files)} files matching '{pattern}'. Converting to Parquet..."
-    )
-    convert_opts = pv.ConvertOptions(
-        column_types=schema,
-        null_values=["", "null", "None", "N/A"],
-        true_values=["True", "true", "yes"],
-        false_values=["False", "false", "no"],
-        strings_can_be_null=True,
-    )
-
-    parquet_files = []
-    for csv_file in csv_files:
-        table = pv.read_csv(csv_file, convert_options=convert_opts)
-        parquet_path = output_dir / f"{csv_file.stem}.parquet"
-        pq.write_table(table, parquet_path)
-        parquet_files.append(parquet_path)
-        log.info(f"Converted {csv_file.name} -> {parquet_path.name}")
-
-    return parquet_files
-
-
-def merge_parquet_files(parquet_files, merged_file: Path):
-    log.info(f"Merging {len(parquet_files)} Parquet files into {merged_file}...")
-    tables = [pq.read_table(p) for p in parquet_files]
-    combined_table = pa.concat_tables(tables, promote_options="default")
-    combined_table = combined_table.combine_chunks()
-    pq.write_table(
-        combined_table,
-        merged_file,
-        compression=parquet["compression"],
-        compression_level=parquet["compression_level"],
+        f"Found {len(csv_files)} files matching '{pattern}'. Converting and merging into {merged_file}..."
     )
+    with duckdb.connect() as con:
+        configure_duckdb(con, threads=threads, memory_limit=memory_limit)
+        types = schema_to_duckdb_types(con, schema)
+        # DuckDB reads all CSVs in parallel and streams straight into the
+        # parquet writer so no intermediate files are required. The dialect
+        # is fixed to what StreamingAmrWriter emits so the sniffer is skipped
+        con.execute(
+            f"""
+COPY
+    (SELECT * FROM read_csv(?, header = true, delim = ',', quote = '"', escape = '"', union_by_name = true, types = ?, nullstr = ?))
+    TO '{sql_string(merged_file)}'
+    (FORMAT parquet, COMPRESSION {parquet["compression"]}, COMPRESSION_LEVEL {parquet["compression_level"]}, ROW_GROUP_SIZE {parquet["row_group_size"]})
+""",
+            [csv_files, types, csv_null_values],
+        )
     log.info(f"Merged Parquet file saved to: {merged_file}")
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Convert CSV files matching a pattern to Parquet and merge. Will create intermediate parquet files in the specified directory"
+        description="Convert CSV files matching a pattern into a single merged Parquet file"
     )
     parser.add_argument(
         "--input_dir",
@@ -76,13 +79,6 @@ def main():
         required=True,
         help="Directory containing the CSV files.",
     )
-    parser.add_argument(
-        "--output_dir",
-        "--output-dir",
-        type=Path,
-        required=True,
-        help="Directory to store the generated Parquet files.",
-    )
     parser.add_argument(
         "--merged_file",
         "--merged-file",
@@ -103,16 +99,18 @@ def main():
         required=True,
         help="Path to YAML or JSON schema file.",
     )
+    add_duckdb_arguments(parser)
 
     args = parser.parse_args()
     schema = load_schema_from_config(args.schema_file)
-    parquet_files = convert_csv_to_parquet(
+    convert_csv_to_parquet(
         input_dir=args.input_dir,
-        output_dir=args.output_dir,
+        merged_file=args.merged_file,
         pattern=args.pattern,
         schema=schema,
+        threads=args.threads,
+        memory_limit=args.memory_limit,
     )
-    merge_parquet_files(parquet_files, args.merged_file)
 
 
 if __name__ == "__main__":
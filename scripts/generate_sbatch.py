@@ -3,18 +3,6 @@
 import argparse
 from math import ceil
 from pathlib import Path
-from itertools import islice
-
-
-def batched(iterable, n):
-    if n < 1:
-        raise ValueError("n must be at least 1")
-    it = iter(iterable)
-    while True:
-        batch = list(islice(it, n))
-        if not batch:
-            return
-        yield batch
 
 
 def generate_directory_structure(base_dir: Path):
@@ -33,33 +21,23 @@ def generate_directory_structure(base_dir: Path):
 
 
 def files_to_process(to_process: Path, previously_processed: Path = None) -> list[str]:
-    lookup = {}
-    gff_files = []
+    lookup = set()
     if previously_processed:
         with open(previously_processed, "rt") as fh:
-            for gff in fh:
-                lookup[gff.strip()] = True
+            lookup = {gff.strip() for gff in fh}
     with open(to_process, "rt") as fh:
-        for gff in fh:
-            gff = gff.strip()
-            if gff not in lookup:
-                gff_files.append(gff)
-    return gff_files
+        return [gff for gff in (line.strip() for line in fh) if gff not in lookup]
 
 
 def split_list_and_write(base_dir: Path, files: list[str]) -> int:
-    split_count = 0
     batch_size = 5000
-    print(
-        f"Splitting {len(files)} GFF(s) into {ceil(len(files)/batch_size)} batches of {batch_size}"
-    )
-    for batch in batched(files, batch_size):
-        path = f"split.gff.{split_count:0>2}"
-        with open(base_dir / path, "wt") as fh:
-            print(f"  > Writing to {base_dir / path}")
-            for gff in batch:
-                fh.write(f"{gff}\n")
-        split_count += 1
+    split_count = ceil(len(files) / batch_size)
+    print(f"Splitting {len(files)} GFF(s) into {split_count} batches of {batch_size}")
+    for i in range(split_count):
+        path = base_dir / f"split.gff.{i:0>2}"
+        print(f"  > Writing to {path}")
+        batch = files[i * batch_size : (i + 1) * batch_size]
+        path.write_text("\n".join(batch) + "\n")
     return split_count
 
 
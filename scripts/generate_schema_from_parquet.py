@@ -8,15 +8,37 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import pyarrow as pa
 import pyarrow.parquet as pq
 import fsspec
 from src.utils import open_file
 
 
-def open_parquet_table(path_or_url: str):
-    with fsspec.open(path_or_url, mode="rb") as f:
-        return pq.read_table(f)
+def open_parquet_schema(path_or_url: str):
+    # Schema lives in the parquet footer so only read that rather than the
+    # whole table. fsspec files are seekable so remote reads are range requests
+    with fsspec.open(str(path_or_url), mode="rb") as f:
+        return pq.read_schema(f)
+
+
+def expand_inputs(inputs: list[str]) -> list[str]:
+    # Expand any globs using the filesystem each input lives on
+    paths = []
+    for path_or_url in inputs:
+        paths.extend(f.full_name for f in fsspec.open_files(path_or_url))
+    if not paths:
+        raise FileNotFoundError(f"No parquet files found for {inputs}")
+    return paths
+
+
+def open_parquet_schemas(inputs: list[str], threads: int = 32):
+    # Footer reads are I/O bound so fetch them concurrently and unify the result
+    paths = expand_inputs(inputs)
+    with ThreadPoolExecutor(min(threads, len(paths))) as executor:
+        schemas = list(executor.map(open_parquet_schema, paths))
+    return pa.unify_schemas(schemas)
 
 
 def schema_to_dict(schema):
@@ -36,10 +58,14 @@ def write_schema(schema_dict, output_file: Path):
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Generate a schema JSON file from a Parquet file (supports HTTP, S3, etc.)."
+        description="Generate a schema JSON file from one or more Parquet files (supports HTTP, S3, etc.)."
     )
     parser.add_argument(
-        "--input", type=Path, required=True, help="Path or URL to the Parquet file."
+        "--input",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Paths, URLs or globs to the Parquet files. Schemas are unified into one.",
     )
     parser.add_argument(
         "--output", type=Path, required=True, help="Output JSON schema file."
@@ -47,12 +73,12 @@ def main():
     args = parser.parse_args()
 
     print(f"Reading schema from: {args.input}")
-    table = open_parquet_table(args.input)
+    schema = open_parquet_schemas(args.input)
 
-    schema_dict = schema_to_dict(table.schema)
+    schema_dict = schema_to_dict(schema)
 
     print("Detected schema:")
-    for field in table.schema:
+    for field in schema:
         print(f"  - {field.name}: {field.type} (Nullable: {field.nullable})")
 
     write_schema(schema_dict, args.output)
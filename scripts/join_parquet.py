@@ -96,16 +96,25 @@ def merge_parquet_duckdb(cfg):
             condition = cond["condition"]
             where_condition += f" AND l.{left_key} {condition}"
 
+    # Only read the columns each side needs so the column chunks we do not
+    # use are never fetched. dict.fromkeys() dedupes whilst keeping order
+    left_read = ", ".join(
+        dict.fromkeys(
+            join_keys + left_nonkeys + [cond["left_key"] for cond in conditions]
+        )
+    )
+    right_read = ", ".join(dict.fromkeys(join_keys + right_nonkeys))
+
     query = f"""
         SELECT {select_cols}
-        FROM read_parquet('{left}') AS l
-        {join_type} JOIN read_parquet('{right}') AS r
+        FROM (SELECT {left_read} FROM read_parquet(?)) AS l
+        {join_type} JOIN (SELECT {right_read} FROM read_parquet(?)) AS r
         ON {join_condition}
         {where_condition}
     """
 
     print(f"Running {join_type} JOIN on {join_keys}")
-    result_reader = con.execute(query).arrow()
+    result_reader = con.execute(query, [str(left), str(right)]).arrow()
     result_table = result_reader.read_all()
     pq.write_table(result_table, output)
     print(f"✅ Merge complete → {output} ({len(result_table)} rows)")
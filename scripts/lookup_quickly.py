@@ -56,13 +56,12 @@ fieldnames = [
     "ontology_link",
 ]
 output = []
-for i in data:
-    subclass = i["subclass"]
-    a = l.convert_antibiotic(subclass)
+subclasses = [i["subclass"] for i in data]
+for subclass, a in zip(subclasses, l.convert_antibiotics(subclasses)):
     if a:
         print(f"Subclass {subclass} converts to: {a}")
-        a["subclass"] = subclass
-        output.append(a)
+        # convert_antibiotic() results are cached so copy before adding to them
+        output.append({**a, "subclass": subclass})
     else:
         print(f"Subclass {subclass} no hit")
 
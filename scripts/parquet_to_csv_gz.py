@@ -1,25 +1,45 @@
 #!/usr/bin/env python3
+import gzip
 import sys
 import pyarrow as pa
 import pyarrow.parquet as pq
 import pyarrow.csv as csv
 
+# gzip at level 3 is much faster than Arrow's default of 9 for a small
+# increase in size. Arrow's zstd default (level 1) is already fast
+gzip_compression_level = 3
 
-def parquet_to_csv(input_path: str, output_path: str):
-    """Convert a Parquet file to CSV, gzipping if output ends with .gz."""
-    table = pq.read_table(input_path)
+
+def open_output(output_path: str):
+    """Open the output stream, compressing if the path ends with .gz or .zst."""
     if output_path.endswith(".gz"):
-        with pa.OSFile(output_path, "wb") as f:
-            with pa.CompressedOutputStream(f, "gzip") as gz:
-                csv.write_csv(table, gz)
-    else:
-        with pa.OSFile(output_path, "wb") as f:
-            csv.write_csv(table, f)
+        return gzip.open(output_path, "wb", compresslevel=gzip_compression_level)
+    elif output_path.endswith(".zst"):
+        return pa.CompressedOutputStream(pa.OSFile(output_path, "wb"), "zstd")
+    return pa.OSFile(output_path, "wb")
+
+
+def write_batches(parquet_file: pq.ParquetFile, sink, batch_size: int):
+    """Stream record batches from a Parquet file into a CSV sink."""
+    write_options = csv.WriteOptions(include_header=True, batch_size=batch_size)
+    with csv.CSVWriter(
+        sink, parquet_file.schema_arrow, write_options=write_options
+    ) as writer:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            writer.write_batch(batch)
+
+
+def parquet_to_csv(input_path: str, output_path: str, batch_size: int = 65_536):
+    """Convert a Parquet file to CSV, compressing if output ends with .gz or .zst.
+    Only one batch of rows is held in memory at a time."""
+    parquet_file = pq.ParquetFile(input_path)
+    with open_output(output_path) as sink:
+        write_batches(parquet_file, sink, batch_size)
 
 
 def main():
     if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} <input.parquet> [output.csv[.gz]]")
+        print(f"Usage: {sys.argv[0]} <input.parquet> [output.csv[.gz|.zst]]")
         sys.exit(1)
 
     input_path = sys.argv[1]
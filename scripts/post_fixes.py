@@ -1,39 +1,56 @@
 #!/usr/bin/env python3
 
+# Add src as a package
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
 import argparse
 from pathlib import Path
 import duckdb
+from src.utils import configure_duckdb, add_duckdb_arguments
+from src.config import parquet
 
 
 def load_duckdb(con, args) -> None:
     print(f"Loading database tables into DuckDB")
+    # Prefetch whole parquet files so remote inputs are read in fewer requests
+    con.execute("SET prefetch_all_parquet_files = true")
+    if args.filter_genomes:
+        print(f" > Loading genomes filter from {args.filter_genomes}")
+        con.execute(
+            "CREATE TABLE filter_genomes as SELECT * from read_csv(?)",
+            [str(args.filter_genomes)],
+        )
+        filter_genomes = con.execute("SELECT count(*) FROM filter_genomes").fetchone()[
+            0
+        ]
+        print(
+            f" > Found {filter_genomes} entries to use for fltering genomes in genotypes"
+        )
     print(f" > Loading genotype from {args.genotype}")
+    # Rows without a taxon_id are unusable and suppressed genomes are not
+    # wanted so skip both at load rather than deleting them later
+    query = "SELECT g.* FROM read_parquet(?) g"
+    if args.filter_genomes:
+        print(" > Skipping genotype records where they have been suppressed")
+        query += " ANTI JOIN filter_genomes f ON g.assembly_ID = f.id"
     con.execute(
-        "CREATE TABLE genotype AS SELECT * FROM read_parquet(?)", [str(args.genotype)]
+        f"CREATE TABLE genotype AS {query} WHERE g.taxon_id IS NOT NULL",
+        [str(args.genotype)],
     )
     print(f" > Loading phenotype from {args.phenotype}")
     con.execute(
         "CREATE TABLE phenotype AS SELECT * FROM read_parquet(?)", [str(args.phenotype)]
     )
     con.execute(
-        "CREATE TABLE fix_antibiotics as select * FROM read_csv(?)",
+        "CREATE TABLE fix_antibiotics as select subclass, label, id, ontology_link FROM read_csv(?)",
         [str(args.antibiotic_lookup)],
     )
     print(f" > Loading antibiotic fixes from {args.antibiotic_lookup}")
     antib_fix = con.execute("SELECT count(*) FROM fix_antibiotics").fetchone()[0]
     print(f" > Found {antib_fix} entries to use for fixing antibiotic naming")
-    if args.filter_genomes:
-        print(f" > Loading genomes filter from {args.filter_genomes}")
-        con.execute(
-            "CREATE TABLE filter_genomes as SELECT * from read_csv(?)",
-            [str(args.filter_genomes)],
-        )
-        filter_genomes = con.execute("SELECT count(*) FROM filter_genomes").fetchone()[
-            0
-        ]
-        print(
-            f" > Found {filter_genomes} entries to use for fltering genomes in genotypes"
-        )
 
 
 species_names_override = [
@@ -55,63 +72,44 @@ def update_genotype(con) -> None:
 #     con.execute(query)
     for overrides in species_names_override:
         print(f" > Applying specific override for {overrides[1]}")
-        con.execute("UPDATE genotype SET species =? WHERE species=?", overrides)
+    replace_values(con, table, "species", species_names_override)
 
-    print(" > Removing any 'subsp.' information from species")
-    con.execute(
-        "UPDATE genotype SET species = regexp_replace(species, ?, '') WHERE species LIKE ?",
-        ["\\ssubsp\\..+$", "%subsp.%"],
-    )
-    print(" > Removing any 'complex' information from species")
-    con.execute(
-        "UPDATE genotype SET species = regexp_replace(species, ?, '') WHERE species LIKE ?",
-        ["\\scomplex.+$", "%complex%"],
-    )
-    print(" > Removing any 'variant' information from species")
-    con.execute(
-        "UPDATE genotype SET species = regexp_replace(species, ?, '') WHERE species LIKE ?",
-        ["\\svariant.+$", "%variant%"],
-    )
-    print(" > Removing any 'sp.' information from species")
-    con.execute(
-        "UPDATE genotype SET species = regexp_replace(species, ?, '') WHERE species LIKE ?",
-        ["\\ssp\\..*$", "%sp.%"],
-    )
-    print(" > Removing anything beyond the first two words in species")
-    con.execute(
-        "UPDATE genotype SET species = COALESCE(NULLIF(regexp_extract(species, ?), ''), species)",
-        ["^(\\S+\\s+\\S+)"],
+    print(
+        " > Cleaning species by removing any 'subsp.', 'complex', 'variant' and 'sp.' information, anything beyond the first two words and formatting as 'Upper lower' e.g. Haemophilus influenzae"
     )
-    print(" > Ensuring the species are 'Upper lower' formatted e.g. Haemophilus influenzae")
+    # All species clean ups are applied in one UPDATE so the column is only
+    # rewritten once. The qualifiers are stripped with a single alternation
+    # from the first one found. The options flag 's' lets '.' match newlines
+    # which mirrors regexp_extract() on the first two words. The cleaned
+    # expression is repeated for the casing and DuckDB computes it once
+    cleaned = "regexp_replace(regexp_replace(species, $1, ''), $2, '\\1', 's')"
     con.execute(
-        """UPDATE genotype SET species = upper(left(species, 1)) || lower(substr(species, 2))"""
+        f"UPDATE genotype SET species = upper(left({cleaned}, 1)) || lower(substr({cleaned}, 2))",
+        ["\\s(?:subsp\\..+|complex.+|variant.+|sp\\..*)$", "^(\\S+\\s+\\S+).*$"],
     )
 
-    rows = con.execute(
-        "SELECT count(*) FROM genotype where taxon_id IS NULL"
-    ).fetchone()[0]
-    if rows:
-        print(f"Deleting any extra rows from genotype")
-        query = """
-DELETE FROM genotype
-WHERE taxon_id IS NULL
-"""
-        con.execute(query)
-
     drop_generated_columns(con, table)
 
     print(" > Fixing missing antibiotics")
+    print(f" > Setting {table}.antibiotic_name = '' to NULL where no fix exists")
+    # Only rows with an empty antibiotic_name change. Left joining them to the
+    # fixes fills in those we know and leaves the rest as NULL in one pass
     con.execute(
         """
 UPDATE genotype
-SET antibiotic_name = a.label, antibiotic_ontology = replace(a.id, ':', '_'), antibiotic_ontology_link = a.ontology_link
-FROM fix_antibiotics a
-WHERE genotype.subclass = a.subclass and genotype.antibiotic_name = ''
+SET antibiotic_name = NULLIF(a.label, ''),
+    antibiotic_ontology = CASE WHEN a.subclass IS NULL THEN genotype.antibiotic_ontology ELSE replace(a.id, ':', '_') END,
+    antibiotic_ontology_link = CASE WHEN a.subclass IS NULL THEN genotype.antibiotic_ontology_link ELSE a.ontology_link END
+FROM (
+    SELECT g.rowid AS row_id, f.subclass, f.label, f.id, f.ontology_link
+    FROM genotype g
+    LEFT JOIN fix_antibiotics f ON g.subclass = f.subclass
+    WHERE g.antibiotic_name = ''
+) a
+WHERE genotype.rowid = a.row_id
 """
     )
     drop_antibiotic_abbreviations(con, table)
-    set_string_column_to_null(con, table, "antibiotic_name")
-    con.commit()
 
 
 def update_phenotype(con) -> None:
@@ -121,11 +119,24 @@ def update_phenotype(con) -> None:
     affected_ids = [["SAMEA1028830", "8830"]]
     for ids in affected_ids:
         print(f"  > Changing {ids[1]} to {ids[0]}")
-        query = f"UPDATE {table} SET BioSample_ID = ? WHERE BioSample_ID = ?"
-        con.execute(query, ids)
+    replace_values(con, table, "BioSample_ID", affected_ids)
     drop_generated_columns(con, table)
     drop_antibiotic_abbreviations(con, table)
-    con.commit()
+
+
+def replace_values(con, table: str, column: str, replacements: list) -> None:
+    """Apply a list of [new, old] value replacements to a column with a single
+    UPDATE so the table is only scanned once however many replacements there are"""
+    if not replacements:
+        return
+    cases = " ".join("WHEN ? THEN ?" for _ in replacements)
+    placeholders = ", ".join("?" for _ in replacements)
+    params = [value for new, old in replacements for value in (old, new)]
+    params += [old for _, old in replacements]
+    con.execute(
+        f"UPDATE {table} SET {column} = CASE {column} {cases} END WHERE {column} IN ({placeholders})",
+        params,
+    )
 
 
 def drop_generated_columns(con, table) -> None:
@@ -154,101 +165,48 @@ def drop_column(con, table: str, column: str) -> None:
     con.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}")
 
 
-def set_string_column_to_null(con, table: str, column: str) -> None:
-    print(f" > Setting {table}.{column} = '' to NULL")
-    con.execute(f"UPDATE {table} SET {column} = NULL WHERE {column} = ''")
-
-
-def filter_genomes(con) -> None:
-    """Remove assemblies as specified in the assemblies list"""
-    print("Deleting genotype records where they have been suppressed")
-    con.execute(
-        "DELETE FROM genotype WHERE assembly_ID IN (select id from filter_genomes)"
-    )
-
-
 def create_assembly(con) -> None:
     print("Creating assembly table from phenotype and genotype tables")
 
-    print(" > Creating unique assembly records from phenotype")
-    con.execute(
-        """
-CREATE OR REPLACE TABLE uniq_pheno_ass AS
-SELECT DISTINCT
-    BioSample_ID,
-    assembly_ID,
-    genus,
-    species,
-    organism,
-    isolate,
-FROM phenotype
-"""
-    )
-
-    print(" > Creating unique assembly records from genotype")
-    con.execute(
-        """
-CREATE OR REPLACE TABLE uniq_geno_ass AS
-SELECT DISTINCT
-    BioSample_ID,
-    assembly_ID,
-    genus,
-    species,
-    organism,
-    isolate,
-    taxon_id
-FROM genotype
-"""
-    )
-
-    print(" > Generating unique assembly table based on phenotype data")
-    con.execute(
-        """
-CREATE OR REPLACE TABLE assembly AS 
-SELECT DISTINCT 
-    p.BioSample_ID, 
-    p.assembly_ID, 
-    p.genus, 
-    p.species,
-    ANY_VALUE(COALESCE(p.organism, g.organism)) as organism, 
+    # Join the unique assembly records from both tables in a single pass. Where
+    # both sides have a record phenotype wins for organism and genotype wins
+    # for isolate and taxon_id
+    print(" > Joining unique assembly records from phenotype and genotype")
+    query = """
+SELECT
+    COALESCE(p.BioSample_ID, g.BioSample_ID) as BioSample_ID,
+    COALESCE(p.assembly_ID, g.assembly_ID) as assembly_ID,
+    COALESCE(p.genus, g.genus) as genus,
+    COALESCE(p.species, g.species) as species,
+    ANY_VALUE(COALESCE(p.organism, g.organism)) as organism,
     ANY_VALUE(COALESCE(g.isolate, p.isolate)) as isolate,
     ANY_VALUE(g.taxon_id) as taxon_id,
-    IF(ANY_VALUE(p.BioSample_ID) is null, false, true) as phenotype, 
-    IF(ANY_VALUE(g.BioSample_ID) is null, false, true) as genotype
-FROM uniq_pheno_ass p
-LEFT JOIN uniq_geno_ass g on (p.BioSample_ID = g.BioSample_ID and p.assembly_ID = g.assembly_ID)
-group by p.BioSample_ID, p.assembly_ID, p.genus, p.species
+    bool_or(p.BioSample_ID IS NOT NULL) as phenotype,
+    bool_or(g.BioSample_ID IS NOT NULL) as genotype
+FROM (
+    SELECT DISTINCT BioSample_ID, assembly_ID, genus, species, organism, isolate
+    FROM phenotype
+) p
+FULL OUTER JOIN (
+    SELECT DISTINCT BioSample_ID, assembly_ID, genus, species, organism, isolate, taxon_id
+    FROM genotype
+) g on (p.BioSample_ID = g.BioSample_ID and p.assembly_ID = g.assembly_ID)
+group by 1, 2, 3, 4
 """
-    )
-
-    print(" > Adding data from genotype")
-    con.execute(
-        """
-INSERT INTO assembly
-SELECT DISTINCT 
-    g.BioSample_ID, 
-    g.assembly_ID, 
-    g.genus, 
-    g.species,
-    ANY_VALUE(COALESCE(g.organism, p.organism)) as organism, 
-    ANY_VALUE(COALESCE(g.isolate, p.isolate)) as isolate,
-    ANY_VALUE(g.taxon_id) as taxon_id,
-    IF(ANY_VALUE(p.BioSample_ID) is null, false, true) as phenotype, 
-    IF(ANY_VALUE(g.BioSample_ID) is null, false, true) as genotype
-FROM uniq_geno_ass g
-LEFT JOIN assembly p on (p.BioSample_ID = g.BioSample_ID and p.assembly_ID = g.assembly_ID)
-WHERE p.BioSample_ID IS NULL
-group by g.BioSample_ID, g.assembly_ID, g.genus, g.species
-"""
-    )
 
+    # Declare the NOT NULL constraints up front and insert into the typed
+    # table. Column types are taken from the query so they follow the inputs
     columns = ["BioSample_ID", "genus", "species", "organism", "phenotype", "genotype"]
     for col in columns:
         print(f" > Setting column {col} as NOT NULL")
-        con.execute(f"ALTER TABLE assembly ALTER COLUMN {col} SET NOT NULL")
+    column_defs = ", ".join(
+        f"{name} {col_type}{' NOT NULL' if name in columns else ''}"
+        for name, col_type, *_ in con.execute(f"DESCRIBE {query}").fetchall()
+    )
+    con.execute(f"CREATE OR REPLACE TABLE assembly ({column_defs})")
+    con.execute(f"INSERT INTO assembly BY NAME {query}")
     rows = con.execute("SELECT COUNT(*) FROM assembly").fetchone()[0]
     print(f"Created the assembly table with {rows} row(s)")
-    con.commit()
 
 
 def write_to_disk(con, args):
@@ -265,7 +223,7 @@ def write_to_disk(con, args):
 COPY
     (SELECT * FROM {t})
     TO '{path}'
-    (FORMAT parquet, COMPRESSION zstd)
+    (FORMAT parquet, COMPRESSION {parquet["compression"]}, COMPRESSION_LEVEL {parquet["compression_level"]}, ROW_GROUP_SIZE {parquet["row_group_size"]})
 """
         con.execute(query)
 
@@ -314,6 +272,7 @@ def arg_parser():
         required=False,
         help="File of Assembly IDs to remove from a genotype file",
     )
+    add_duckdb_arguments(parser)
     return parser
 
 
@@ -321,11 +280,10 @@ def main():
     parser = arg_parser()
     args = parser.parse_args()
     with duckdb.connect() as con:
+        configure_duckdb(con, threads=args.threads, memory_limit=args.memory_limit)
         load_duckdb(con, args)
         update_phenotype(con)
         update_genotype(con)
-        if args.filter_genomes:
-            filter_genomes(con)
         if args.write_assembly:
             create_assembly(con)
         else:
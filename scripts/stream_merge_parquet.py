@@ -32,20 +32,26 @@ def merge_parquet_files(
     compression = pq_file.metadata.row_group(0).column(0).compression
     print(f"Using schema from {first_file} and compression '{compression}'")
 
-    writer = pq.ParquetWriter(
+    # Stream batches through a single writer so only one batch is held in memory
+    with pq.ParquetWriter(
         output_file, schema, compression=compression, use_dictionary=True
-    )
-
-    # Process files sequentially
-    for file in files:
-        print(f"  > Processing {file}")
-        reader = pq.ParquetFile(file)
-        for rg_index in range(reader.num_row_groups):
-            row_group = reader.read_row_group(rg_index)
-            for i in range(0, row_group.num_rows, chunk_size):
-                writer.write_table(row_group.slice(i, chunk_size))
+    ) as writer:
+        for file in files:
+            print(f"  > Processing {file}")
+            # Memory map local files to avoid copying through a read buffer.
+            # Anything else is pre-buffered to coalesce column chunk reads
+            local = os.path.isfile(file)
+            with pq.ParquetFile(
+                file,
+                memory_map=local,
+                pre_buffer=not local,
+                buffer_size=0 if local else 8 * 1024 * 1024,
+            ) as reader:
+                for batch in reader.iter_batches(
+                    batch_size=chunk_size, use_threads=True
+                ):
+                    writer.write_batch(batch)
 
-    writer.close()
     print(
         f"Merged {len(files)} files into {output_file} using compression '{compression}'"
     )
@@ -1,5 +1,7 @@
 from argparse import ArgumentParser
-from functools import cached_property
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, partial
 from .lookup import Lookup, LocalAntibioticLookup
 from .processor import Processor
 from .config import (
@@ -11,70 +13,192 @@ from .config import (
 )
 from .writer import Formats, StreamingAmrWriter
 from .utils import open_file
-import pathlib
+from fnmatch import fnmatch
+import itertools
+import os
 import logging
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
+# Lookups owned by each worker process. Set by _init_worker
+_worker_lookups = {}
+
+
+def _init_worker(
+    lookup_class=Lookup, local_antibiotic_lookup_class=LocalAntibioticLookup
+):
+    _worker_lookups["lookup"] = lookup_class()
+    _worker_lookups["local_antibiotic_lookup"] = local_antibiotic_lookup_class(
+        antibiotics_config
+    )
+
+
+def _parse_file_in_worker(file, gff_type: str, amrfinderplus_type: str):
+    return parse_file(
+        file,
+        lookup=_worker_lookups["lookup"],
+        local_antibiotic_lookup=_worker_lookups["local_antibiotic_lookup"],
+        gff_type=gff_type,
+        amrfinderplus_type=amrfinderplus_type,
+    )
+
+
+def _walk_gffs(path: str):
+    """Lazily yield GFF files (*.gff*) under a directory. Entries are sorted by
+    name per directory so output order is deterministic without walking the
+    whole tree before the first file is parsed. Symlinked directories are not
+    followed so a link loop cannot recurse forever"""
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_gffs(entry.path)
+        elif fnmatch(entry.name, "*.gff*"):
+            yield entry.path
+
+
+def _iter_targets(path: str):
+    """Lazily yield stripped paths from a file of paths skipping blank and comment lines"""
+    with open_file(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def parse_file(
+    file,
+    lookup: Lookup,
+    local_antibiotic_lookup: LocalAntibioticLookup,
+    gff_type: str,
+    amrfinderplus_type: str,
+) -> Optional[Tuple[List[Dict[str, any]], Dict[str, any]]]:
+    """Process a single GFF file into its AMR records and assembly summary
+
+    Args:
+        file (str): Path to the GFF file
+        lookup (Lookup): The lookup object to use for ontology and GCA lookups
+        local_antibiotic_lookup (LocalAntibioticLookup): Local antibiotic lookup object
+        gff_type (str): Type of GFF feature to process
+        amrfinderplus_type (str): Type of AMR record to process
+
+    Returns:
+        Optional[Tuple[List[Dict[str, any]], Dict[str, any]]]: The AMR records and
+        assembly summary or None if the file could not be processed
+    """
+    log.info(f"Processing file {file}")
+    assembly = Processor.gff_path_to_assembly(file)
+    amrfinderplus_path = Processor.find_amrfinderplus_tsv(file)
+
+    processor = Processor.default_processor(
+        lookup=lookup,
+        local_antibiotic_lookup=local_antibiotic_lookup,
+        gff_path=file,
+        gff_type=gff_type,
+        amrfinderplus_path=amrfinderplus_path,
+        amrfinderplus_type=amrfinderplus_type,
+        assembly=assembly,
+    )
+
+    try:
+        return processor.process(), processor.assembly_summary
+    except EOFError:
+        log.error(
+            f"{assembly} file {file} might be corrupted. Check the file. Skipping record"
+        )
+    except Exception as e:
+        log.error(f"Unknown issue with {assembly} file {file}. {e}. Skipping record")
+    return None
+
 
 class Cli:
+    # Lookup implementations used here and in each worker process
+    lookup_class = Lookup
+    local_antibiotic_lookup_class = LocalAntibioticLookup
 
     def __init__(self):
         self.records = 0
         self.assemblies = 0
 
     def run(self):
-        files = []
+        files = iter([])
         if self.args.dir:
-            files = sorted(list(pathlib.Path(self.args.dir).rglob("*.gff*")))
+            if not os.path.isdir(self.args.dir):
+                raise NotADirectoryError(
+                    f"Cannot find GFF directory {self.args.dir}. Check --dir"
+                )
+            files = _walk_gffs(self.args.dir)
         elif self.args.files:
-            files = [s.strip() for s in self.args.files]
+            files = iter([s.strip() for s in self.args.files])
         elif self.args.files_list:
-            with open_file(self.args.files_list) as f:
-                files = [line.strip() for line in f]
-        if files:
-            self.process_files(files)
+            files = _iter_targets(self.args.files_list)
+        # files is lazy so peek at the first entry to avoid writing
+        # header-only outputs when there is nothing to process
+        first = next(files, None)
+        if first is not None:
+            self.process_files(itertools.chain([first], files))
         log.info(
             f"Processed {self.records} AMR features from {self.assemblies} assemblies"
         )
 
-    def process_files(self, files: List):
+    def process_files(self, files: Iterable):
         with StreamingAmrWriter(
             self.args.output, columns=default_output_columns, format=Formats.CSV
         ) as amr_csv, StreamingAmrWriter(
             self.args.output_assembly, columns=assembly_fields, format=Formats.CSV
         ) as assembly_csv:
-            for file in files:
-                log.info(f"Processing file {file}")
-                assembly = Processor.gff_path_to_assembly(file)
-                amrfinderplus_path = Processor.find_amrfinderplus_tsv(file)
+            for result in self.parse_files(files):
+                if result is None:
+                    continue
+                output, assembly_summary = result
+                self.records += len(output)
+                self.assemblies += 1
+                amr_csv.write_data(output)
+                # Flushing every file defeats buffering and, for compressed
+                # output, the compressor's block size so flush periodically
+                assembly_csv.write_data(
+                    [assembly_summary], flush=self.assemblies % 256 == 0
+                )
 
-                processor = Processor.default_processor(
+    def parse_files(self, files: Iterable):
+        """Parse files in order yielding the result of parse_file() for each.
+        Parsing is spread over a process pool when --processes is above 1 and
+        each worker holds its own lookups. Writing stays in this process.
+        """
+        if self.args.processes > 1:
+            worker = partial(
+                _parse_file_in_worker,
+                gff_type=self.args.gff_type,
+                amrfinderplus_type=self.args.filter,
+            )
+            files = iter(files)
+            with ProcessPoolExecutor(
+                max_workers=self.args.processes,
+                initializer=_init_worker,
+                initargs=(self.lookup_class, self.local_antibiotic_lookup_class),
+            ) as executor:
+                # Executor.map() submits the whole iterable up front so keep a
+                # bounded window of in-flight files and yield them in order
+                pending = deque(
+                    executor.submit(worker, file)
+                    for file in itertools.islice(files, self.args.processes * 4)
+                )
+                while pending:
+                    result = pending.popleft().result()
+                    for file in itertools.islice(files, 1):
+                        pending.append(executor.submit(worker, file))
+                    yield result
+        else:
+            for file in files:
+                yield parse_file(
+                    file,
                     lookup=self.lookup,
                     local_antibiotic_lookup=self.local_antibiotic_lookup,
-                    gff_path=file,
                     gff_type=self.args.gff_type,
-                    amrfinderplus_path=amrfinderplus_path,
                     amrfinderplus_type=self.args.filter,
-                    assembly=assembly,
                 )
 
-                try:
-                    output = processor.process()
-                    amr_csv.write_data(output)
-                    assembly_csv.write_data([processor.assembly_summary], flush=True)
-                    self.records += len(output)
-                    self.assemblies += 1
-                except EOFError:
-                    log.error(
-                        f"{assembly} file {file} might be corrupted. Check the file. Skipping record"
-                    )
-                except Exception as e:
-                    log.error(
-                        f"Unknown issue with {assembly} file {file}. {e}. Skipping record"
-                    )
-
     @cached_property
     def args(self):
         parser = self.create_argument_parser()
@@ -82,11 +206,11 @@ class Cli:
 
     @cached_property
     def lookup(self):
-        return Lookup()
+        return self.lookup_class()
 
     @cached_property
     def local_antibiotic_lookup(self):
-        return LocalAntibioticLookup(antibiotics_config)
+        return self.local_antibiotic_lookup_class(antibiotics_config)
 
     def create_argument_parser(self):
         parser = ArgumentParser()
@@ -135,4 +259,10 @@ class Cli:
             help="Filter AMRFinderPlus records by this element type",
             type=str,
         )
+        parser.add_argument(
+            "--processes",
+            default=1,
+            help="Number of processes to parse GFF files with. Defaults to 1",
+            type=int,
+        )
         return parser
@@ -73,6 +73,12 @@ default_feature_fields = [
 parquet = {
     "compression": "zstd",
     "compression_level": 3,
+    # Larger row groups and pages amortise metadata and improve column stats
+    "row_group_size": 1_048_576,
+    "data_page_size": 1 << 20,
+    # Most string columns are low cardinality so dictionary encode them
+    "use_dictionary": True,
+    "write_batch_size": 65_536,
 }
 
 species_names_override = {
@@ -0,0 +1,124 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, TextIO
+from urllib.parse import unquote
+
+
+@dataclass(slots=True)
+class GffFeature:
+    seqid: str
+    source: str
+    type: str
+    start: int
+    end: int
+    score: Optional[str]
+    strand: str
+    phase: Optional[str]
+    attributes: Dict[str, List[str]]
+
+    @property
+    def id(self) -> Optional[str]:
+        ids = self.attributes.get("ID")
+        return ids[0] if ids else None
+
+
+def parse_attributes(column: str) -> Dict[str, List[str]]:
+    """Parse a GFF3 column 9 string into a dictionary of attribute lists.
+
+    Values are split on commas and URL unquoted. Attributes given without a
+    value are set to ['true']. This matches how BCBio.GFF reports qualifiers.
+
+    Args:
+        column (str): The raw column 9 attribute string
+
+    Returns:
+        Dict[str, List[str]]: Attribute name to its list of values
+    """
+    attributes = {}
+    # Bind sys.intern locally to skip the module attribute lookup per part
+    intern = sys.intern
+    # Most columns have nothing percent encoded so only unquote when needed
+    encoded = "%" in column
+    for part in column.rstrip(";").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        key, _, value = part.partition("=")
+        # Attribute names are a small vocabulary so share one copy of each
+        key = intern(key)
+        if encoded:
+            values = [unquote(v) for v in value.split(",") if v]
+        else:
+            values = [v for v in value.split(",") if v]
+        attributes.setdefault(key, []).extend(values or ["true"])
+    return attributes
+
+
+def _read_lines(handle: TextIO, block_size: int) -> Iterator[List[str]]:
+    """Read a text handle in large blocks and yield each block's complete
+    lines without their line endings. A partial last line is carried over
+    into the next block."""
+    tail = ""
+    while True:
+        block = handle.read(block_size)
+        if not block:
+            break
+        lines = (tail + block).split("\n")
+        tail = lines.pop()
+        yield lines
+    if tail:
+        yield [tail]
+
+
+def parse_gff(
+    handle: TextIO,
+    gff_type: str = None,
+    contains: str = None,
+    block_size: int = 10 * 1024 * 1024,
+) -> Iterator[GffFeature]:
+    """Stream features from a GFF3 file handle.
+
+    The handle is read in large blocks which are split into lines in one
+    call, avoiding a readline per line on compressed inputs. Comment and
+    directive lines are skipped and parsing stops at the ##FASTA directive.
+    Coordinates are reported as given in the file (1-based, inclusive).
+
+    Args:
+        handle (TextIO): Open text handle to a GFF3 file
+        gff_type (str, optional): Only yield features of this type (column 3). Defaults to None which yields all features.
+        contains (str, optional): Skip lines which do not contain this text before parsing them. Defaults to None.
+        block_size (int, optional): Number of characters to read at a time. Defaults to 10MiB.
+
+    Yields:
+        GffFeature: A parsed feature line
+    """
+    # A substring check is far cheaper than splitting so use it to reject
+    # lines of other types before confirming against column 3
+    type_marker = f"\t{gff_type}\t" if gff_type else None
+    for lines in _read_lines(handle, block_size):
+        for line in lines:
+            if not line or line[0] == "#":
+                if line.startswith("##FASTA"):
+                    return
+                continue
+            if type_marker and type_marker not in line:
+                continue
+            if contains and contains not in line:
+                continue
+            cols = line.rstrip("\r").split("\t", 8)
+            if len(cols) < 8:
+                continue
+            if gff_type and cols[2] != gff_type:
+                continue
+            # seqid, source and type repeat on every line so intern them
+            yield GffFeature(
+                seqid=sys.intern(cols[0]),
+                source=sys.intern(cols[1]),
+                type=sys.intern(cols[2]),
+                start=int(cols[3]),
+                end=int(cols[4]),
+                score=None if cols[5] == "." else cols[5],
+                strand=cols[6],
+                phase=None if cols[7] == "." else cols[7],
+                attributes=parse_attributes(cols[8]) if len(cols) > 8 else {},
+            )
@@ -1,6 +1,8 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
 import requests
+from requests.adapters import HTTPAdapter
 import urllib.parse
 import time
 from functools import lru_cache
@@ -96,8 +98,13 @@ class Lookup:
         "chebi": "http://purl.obolibrary.org/obo/CHEBI_33281",
     }
 
-    def __init__(self):
+    def __init__(self, pool_size: int = 16):
+        # Keep connections to OLS/ENA alive and pooled between lookups
+        self.pool_size = pool_size
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     @lru_cache(maxsize=50)
     def convert_antibiotic(self, antibiotic: str) -> Optional[dict]:
@@ -123,6 +130,20 @@ class Lookup:
         log.warning(f"No ontology match for antibiotic {antibiotic}")
         return None
 
+    def convert_antibiotics(self, antibiotics: List[str]) -> List[Optional[dict]]:
+        """Convert a batch of antibiotic names to ontology terms. Lookups are
+        issued concurrently over the pooled session, one thread per pooled
+        connection, and results are returned in the same order as the input.
+
+        Args:
+            antibiotics (List[str]): The antibiotic names to convert
+
+        Returns:
+            List[Optional[dict]]: The result of convert_antibiotic() for each name
+        """
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(self.convert_antibiotic, antibiotics))
+
     def antibiotic_iri_to_group(
         self, iri: str, ontology: str = "aro"
     ) -> Dict[str, str]:
@@ -182,11 +203,21 @@ class Lookup:
         Returns:
             Dict[str, any]: A dictionary including information including
             'Assembly_ID', 'taxon_id', 'scientific_name', 'genus', 'isolate', and 'Biosample_ID'.
-            If the id is not found an empty dictionary is returned.
+            If the id is not found an empty dictionary is returned. Results are
+            cached per accession so callers must copy before modifying them.
         """
+        try:
+            return self._assembly_summary(assembly_id)
+        except requests.RequestException:
+            return {}
+
+    @lru_cache(maxsize=4096)
+    def _assembly_summary(self, assembly_id: str) -> Dict[str, any]:
+        # Raise rather than return on a failed request so lru_cache does not
+        # remember a transient ENA outage for the rest of the run
         req = self._safe_get(f"https://www.ebi.ac.uk/ena/browser/api/xml/{assembly_id}")
         if not req:
-            return {}
+            raise requests.RequestException(f"No ENA record fetched for {assembly_id}")
         return self.parse_assembly_xml(assembly_id, req.text)
 
     def parse_assembly_xml(self, assembly_id, content: str) -> Dict[str, any]:
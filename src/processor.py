@@ -1,7 +1,6 @@
 import copy
 import csv
 
-from BCBio import GFF
 import logging
 import os
 from pathlib import Path
@@ -10,6 +9,7 @@ import re
 from functools import cached_property
 from typing import List, Dict
 
+from .gff import parse_gff
 from .lookup import Lookup, LocalAntibioticLookup
 from .utils import open_file, bin_from_range_extended
 from .config import (
@@ -23,6 +23,8 @@ from .config import (
 log = logging.getLogger(__name__)
 
 ncbi_evidence_link = "https://www.ncbi.nlm.nih.gov/genome/annotation_prok/evidence/"
+# Strips the known GFF suffixes from a filename in one pass
+_gff_suffix_re = re.compile(r"(?:_annotations|_amrfinderplus)?\.gff(?:\.gz)?$")
 
 
 class Processor:
@@ -62,14 +64,7 @@ class Processor:
         Returns:
             str: The assembly accession parsed from the filename
         """
-        assembly = (
-            os.path.basename(gff_path)
-            .replace(".gz", "")
-            .replace("_annotations.gff", "")
-            .replace("_amrfinderplus.gff", "")
-            .replace(".gff", "")
-        )
-        return assembly
+        return _gff_suffix_re.sub("", os.path.basename(gff_path))
 
     @staticmethod
     def find_amrfinderplus_tsv(gff_path: str):
@@ -100,7 +95,8 @@ class Processor:
         Returns:
             List[Dict[str, any]]: Description of the assembly record from ENA
         """
-        summary = self.lookup.assembly_summary(self.assembly)
+        # Copy as lookups are cached and shared between processors
+        summary = dict(self.lookup.assembly_summary(self.assembly))
         # set some basic information
         summary["phenotype"] = False
         summary["genotype"] = True
@@ -136,6 +132,10 @@ class Processor:
         self.gff_path = gff_path
         self.gff_fields = gff_fields
         self.gff_conversion_field_names = gff_conversion_field_names
+        # Resolve output column to GFF attribute names once rather than per feature
+        self._gff_field_names = [
+            (col, gff_conversion_field_names.get(col, col)) for col in gff_fields
+        ]
         self.gff_type = gff_type
         self.amrfinderplus_path = amrfinderplus_path
         self.amrfinderplus_type = amrfinderplus_type
@@ -156,102 +156,100 @@ class Processor:
             f"Filtering GFF types '{self.gff_type}' and AMRFinderPlus element types '{self.amrfinderplus_type}'"
         )
         with open_file(self.gff_path, mode="rt") as fh:
-            for gff_record in GFF.parse(fh, limit_info={"gff_type": [self.gff_type]}):
-                for feature in gff_record.features:
+            # Only AMRFinderPlus annotated features are of interest so skip
+            # every other line before its attributes are parsed
+            for feature in parse_gff(
+                fh, gff_type=self.gff_type, contains="amrfinderplus_element_symbol"
+            ):
+                if (
+                    "amrfinderplus_element_symbol" in feature.attributes
+                    and feature.attributes["element_type"][0] == self.amrfinderplus_type
+                ):
+                    bin = bin_from_range_extended(feature.start - 1, feature.end)
+                    strand = "-" if feature.strand == "-" else "+"
+                    species = assembly_obj.get("species")
+                    if species in species_names_override:
+                        species = species_names_override[species]
+                    record = {
+                        "assembly_ID": assembly_obj.get("assembly_ID"),
+                        "BioSample_ID": assembly_obj.get("BioSample_ID"),
+                        "genus": assembly_obj.get("genus"),
+                        "species": species,
+                        "organism": assembly_obj.get("species"),
+                        "isolate": assembly_obj.get("isolate"),
+                        "taxon_id": assembly_obj.get("taxon_id"),
+                        "region": feature.seqid,
+                        "region_start": feature.start,
+                        "region_end": feature.end,
+                        "strand": strand,
+                        "_bin": bin,
+                    }
+                    for col, gff_col in self._gff_field_names:
+                        if gff_col in feature.attributes:
+                            record[col] = ";".join(feature.attributes[gff_col])
+                        else:
+                            record[col] = ""
+                    amrfinder = (
+                        amr_records[feature.id] if feature.id in amr_records else {}
+                    )
+
                     if (
-                        "amrfinderplus_element_symbol" in feature.qualifiers
-                        and feature.qualifiers["element_type"][0]
-                        == self.amrfinderplus_type
+                        "HMM_accession" in amrfinder
+                        and amrfinder["HMM_accession"] != "NA"
                     ):
-                        location = feature.location
-                        bin = bin_from_range_extended(location.start, location.end)
-                        strand = "-" if location.strand == -1 else "+"
-                        species = assembly_obj.get("species")
-                        if species in species_names_override:
-                            species = species_names_override[species]
-                        record = {
-                            "assembly_ID": assembly_obj.get("assembly_ID"),
-                            "BioSample_ID": assembly_obj.get("BioSample_ID"),
-                            "genus": assembly_obj.get("genus"),
-                            "species": species,
-                            "organism": assembly_obj.get("species"),
-                            "isolate": assembly_obj.get("isolate"),
-                            "taxon_id": assembly_obj.get("taxon_id"),
-                            "region": gff_record.id,
-                            "region_start": int(location.start) + 1,
-                            "region_end": int(location.end),
-                            "strand": strand,
-                            "_bin": bin,
-                        }
-                        for col in self.gff_fields:
-                            gff_col = self.gff_conversion_field_names.get(col, col)
-                            if gff_col in feature.qualifiers:
-                                record[col] = ";".join(feature.qualifiers[gff_col])
-                            else:
-                                record[col] = ""
-                        amrfinder = (
-                            amr_records[feature.id] if feature.id in amr_records else {}
+                        record["evidence_accession"] = amrfinder["HMM_accession"]
+                        record["evidence_type"] = "HMM"
+                        # Link needs to have version removed and trailing slash added
+                        hmm_accession_clean = re.sub(
+                            r"\.\d+$", "/", amrfinder["HMM_accession"]
                         )
+                        record["evidence_link"] = (
+                            f"{ncbi_evidence_link}{hmm_accession_clean}"
+                        )
+                        record["evidence_description"] = amrfinder["HMM_description"]
 
-                        if (
-                            "HMM_accession" in amrfinder
-                            and amrfinder["HMM_accession"] != "NA"
-                        ):
-                            record["evidence_accession"] = amrfinder["HMM_accession"]
-                            record["evidence_type"] = "HMM"
-                            # Link needs to have version removed and trailing slash added
-                            hmm_accession_clean = re.sub(
-                                r"\.\d+$", "/", amrfinder["HMM_accession"]
-                            )
-                            record["evidence_link"] = (
-                                f"{ncbi_evidence_link}{hmm_accession_clean}"
-                            )
-                            record["evidence_description"] = amrfinder[
-                                "HMM_description"
-                            ]
-
-                        amr_class = amrfinder.get("Class", "NA")
-                        amr_subclass = amrfinder.get("Subclass", "NA")
-                        is_amr_subclass = False if amr_class == amr_subclass else True
-                        if is_amr_subclass:
-                            compounds = (
-                                amr_subclass.split("/")
-                                if "/" in amr_subclass
-                                else [amr_subclass]
-                            )
-                            for compound in compounds:
-                                new_record = copy.deepcopy(record)
-                                new_record["split_subclass"] = compound
-                                if amrfinder.get("Subclass") != "NA":
-                                    compound_obj = (
-                                        self.local_antibiotic_lookup.convert_antibiotic(
-                                            compound
-                                        )
+                    amr_class = amrfinder.get("Class", "NA")
+                    amr_subclass = amrfinder.get("Subclass", "NA")
+                    is_amr_subclass = False if amr_class == amr_subclass else True
+                    if is_amr_subclass:
+                        compounds = (
+                            amr_subclass.split("/")
+                            if "/" in amr_subclass
+                            else [amr_subclass]
+                        )
+                        for compound in compounds:
+                            new_record = copy.deepcopy(record)
+                            new_record["split_subclass"] = compound
+                            if amrfinder.get("Subclass") != "NA":
+                                compound_obj = (
+                                    self.local_antibiotic_lookup.convert_antibiotic(
+                                        compound
                                     )
-                                    if compound_obj is None:
-                                        # Try the REST lookup
-                                        compound_obj = self.lookup.convert_antibiotic(
-                                            compound
-                                        )
-                                    # Both lookups failed
-                                    if compound_obj is None:
-                                        record["antibiotic_name"] = ""
-                                        record["antibiotic_ontology_link"] = ""
-                                    # Successful lookup
-                                    else:
-                                        antibiotic_name = compound_obj.get("label")
-                                        new_record["antibiotic_name"] = antibiotic_name
-                                        new_record["antibiotic_ontology"] = (
-                                            compound_obj.get("short_form")
-                                        )
-                                        new_record["antibiotic_ontology_link"] = (
-                                            compound_obj.get("ontology_link")
-                                        )
-                                output.append(new_record)
-                        else:
-                            record["antibiotic_name"] = ""
-                            record["antibiotic_ontology_link"] = ""
-                            output.append(record)
+                                )
+                                if compound_obj is None:
+                                    # Try the REST lookup
+                                    compound_obj = self.lookup.convert_antibiotic(
+                                        compound
+                                    )
+                                # Both lookups failed
+                                if compound_obj is None:
+                                    record["antibiotic_name"] = ""
+                                    record["antibiotic_ontology_link"] = ""
+                                # Successful lookup
+                                else:
+                                    antibiotic_name = compound_obj.get("label")
+                                    new_record["antibiotic_name"] = antibiotic_name
+                                    new_record["antibiotic_ontology"] = (
+                                        compound_obj.get("short_form")
+                                    )
+                                    new_record["antibiotic_ontology_link"] = (
+                                        compound_obj.get("ontology_link")
+                                    )
+                            output.append(new_record)
+                    else:
+                        record["antibiotic_name"] = ""
+                        record["antibiotic_ontology_link"] = ""
+                        output.append(record)
         log.info(f"Processed {len(output)} AMR records")
         return output
 
@@ -1,5 +1,6 @@
 import pyarrow as pa
 import pandas as pd
+from functools import lru_cache
 from typing import List
 from pathlib import Path
 from .utils import slurp_json
@@ -33,6 +34,8 @@ TYPE_MAP = {
 }
 
 
+# pa.Schema is immutable so cached schemas are safe to share between callers
+@lru_cache(maxsize=32)
 def load_schema_from_config(schema_file: Path) -> pa.Schema:
     blob = slurp_json(schema_file)
     schema = blob["schema"]
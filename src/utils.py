@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Any
 
 
-def open_file(file_path: str | Path, mode: str = "rt"):
+def open_file(file_path: str | Path, mode: str = "rt", buffering: int = -1):
     """Opens a file path which can be compressed or uncompressed
 
     Supports the following extensions and algorithms:
@@ -17,6 +17,8 @@ def open_file(file_path: str | Path, mode: str = "rt"):
     * .xz - lzma
     * .br - brotli
 
+    The buffering argument is passed to open() for uncompressed files and
+    ignored otherwise.
     """
     file = Path(file_path)
     if file.suffix == ".gz":
@@ -27,7 +29,7 @@ def open_file(file_path: str | Path, mode: str = "rt"):
         return lzma.open(file, mode)
     elif file.suffix == ".br":
         return brotli.open(file, mode)
-    return open(file, mode)
+    return open(file, mode, buffering=buffering)
 
 
 def slurp_file(file_path: str | Path, mode: str = "rt") -> str:
@@ -44,6 +46,49 @@ def slurp_json(file_path: str | Path, mode: str = "rt") -> Any:
         return json.load(fh)
 
 
+def sql_string(value: str | Path) -> str:
+    """Escape a value for use inside a single quoted SQL string literal"""
+    return str(value).replace("'", "''")
+
+
+def configure_duckdb(con, threads: int | None = None, memory_limit: str | None = None):
+    """Apply the common settings for our DuckDB batch jobs to a connection
+
+    Threads and the memory limit are left to DuckDB unless given, as its own
+    defaults respect cgroup limits such as a SLURM allocation. The object
+    cache avoids re-reading parquet footers when a file is scanned more than
+    once.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection to configure
+        threads (int, optional): Number of threads to use. Defaults to DuckDB's own default.
+        memory_limit (str, optional): Memory DuckDB can use e.g. 8GB. Defaults to DuckDB's own default.
+    """
+    if threads:
+        con.execute("SET threads TO ?", [threads])
+    if memory_limit:
+        con.execute("SET memory_limit = ?", [memory_limit])
+    con.execute("PRAGMA enable_object_cache")
+    return con
+
+
+def add_duckdb_arguments(parser):
+    """Add the --threads and --memory-limit options used by configure_duckdb()"""
+    parser.add_argument(
+        "--threads",
+        type=int,
+        required=False,
+        help="Number of threads DuckDB can use. Defaults to DuckDB's default which respects cgroup limits",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=str,
+        required=False,
+        help="Memory DuckDB can use e.g. 8GB. Defaults to DuckDB's default which respects cgroup limits",
+    )
+    return parser
+
+
 _binFirstShift = 17
 _binNextShift = 3
 _binOffsetOldToExtended = 4681
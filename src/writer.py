@@ -32,6 +32,8 @@ class Formats(Enum):
 
 class StreamingAmrWriter:
     log = logging.getLogger(__name__)
+    # Rows are written sequentially so a large buffer cuts down on write calls
+    buffer_size = 4 * 1024 * 1024
 
     def __init__(
         self, filename: str, columns: List[str], format: Formats = Formats.TSV
@@ -63,7 +65,7 @@ class StreamingAmrWriter:
             pass
         # CSV we are okay to init
         else:
-            self._fh = open_file(self.filename, mode="wt")
+            self._fh = open_file(self.filename, mode="wt", buffering=self.buffer_size)
             self._writer = DictWriter(
                 self._fh, fieldnames=self.columns, dialect=self.format.dialect()
             )
@@ -76,14 +78,14 @@ class StreamingAmrWriter:
         if exc_type:
             print(f"Exception occurred: {exc_value}")
 
-    def write_data(self, data=List[dict], flush: False = bool) -> None:
+    def write_data(self, data: List[dict], flush: bool = False) -> None:
         """Writes the given data dictionary to the output file. Any mismatch
         between the columns provided at initialisation and the keys in the data
         dictionary will result in the code failing.
 
         Args:
             data (Dict[str,any]): A list of dictionaries to write to a file
-            flush bool
+            flush (bool): Flush the file handle once the batch is written. Defaults to False.
         """
         if self.format == Formats.PARQUET:
             self._write_parquet(data)
@@ -98,23 +100,28 @@ class StreamingAmrWriter:
                 first_table.schema,
                 compression=parquet["compression"],
                 compression_level=parquet["compression_level"],
+                data_page_size=parquet["data_page_size"],
+                use_dictionary=parquet["use_dictionary"],
+                write_batch_size=parquet["write_batch_size"],
+                write_statistics=True,
             )
             self._writer = writer
             self._fh = writer
             self._schema = first_table.schema
             self._first_write = True
-            self._writer.write_table(first_table)
+            self._writer.write_table(
+                first_table, row_group_size=parquet["row_group_size"]
+            )
         else:
             table = pa.Table.from_pylist(data, self._schema)
-            self._writer.write_table(table)
+            self._writer.write_table(table, row_group_size=parquet["row_group_size"])
 
-    def _write_csv(self, data, flush: False = bool) -> None:
+    def _write_csv(self, data, flush: bool = False) -> None:
         if not self._writer:
             self._open()
-        for row in data:
-            self._writer.writerow(row)
-            if flush:
-                self._fh.flush()
+        self._writer.writerows(data)
+        if flush:
+            self._fh.flush()
 
     def close(self):
         self._fh.close()
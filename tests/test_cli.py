@@ -0,0 +1,79 @@
+import shutil
+import pytest
+from pathlib import Path
+from src.cli import Cli, _iter_targets, _walk_gffs
+
+
+@pytest.fixture
+def example_data_dir():
+    return Path(__file__).resolve().parent / "test_data"
+
+
+class FakeLookup:
+    """Offline stand-in for both Lookup and LocalAntibioticLookup"""
+
+    def __init__(self, *args):
+        pass
+
+    def assembly_summary(self, assembly):
+        return {
+            "assembly_ID": assembly,
+            "BioSample_ID": "SAMD00060955",
+            "species": "Escherichia coli",
+            "organism": "Escherichia coli",
+            "genus": "Escherichia",
+        }
+
+    def convert_antibiotic(self, compound):
+        return {"label": compound.lower(), "short_form": "ARO_0000049"}
+
+
+@pytest.fixture
+def gff_dir(example_data_dir, tmp_path):
+    for i in range(1, 13):
+        for suffix in ("annotations.gff", "amrfinderplus.tsv"):
+            shutil.copy(
+                example_data_dir / f"GCA_000091005_{suffix}",
+                tmp_path / f"GCA_{i:09d}_{suffix}",
+            )
+    return tmp_path
+
+
+def test_walk_gffs(tmp_path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "x.gff.gz").touch()
+    (tmp_path / "a" / "notes.txt").touch()
+    (tmp_path / "b" / "y.gff").touch()
+    (tmp_path / "c.gff").touch()
+    # A symlink loop must not be followed
+    (tmp_path / "b" / "loop").symlink_to(tmp_path, target_is_directory=True)
+    found = [Path(f).relative_to(tmp_path) for f in _walk_gffs(str(tmp_path))]
+    assert found == [Path("a/x.gff.gz"), Path("b/y.gff"), Path("c.gff")]
+
+
+def test_iter_targets(tmp_path):
+    targets = tmp_path / "files.txt"
+    targets.write_text("# header\n/data/a.gff\n\n   \n  /data/b.gff  \n#/data/c.gff\n")
+    assert list(_iter_targets(str(targets))) == ["/data/a.gff", "/data/b.gff"]
+
+
+def test_parse_files_in_order(gff_dir):
+    files = list(_walk_gffs(str(gff_dir)))
+
+    results = {}
+    for processes in (1, 2):
+        app = Cli()
+        # Passed to the workers through initargs so this holds for any start method
+        app.lookup_class = FakeLookup
+        app.local_antibiotic_lookup_class = FakeLookup
+        app.args = app.create_argument_parser().parse_args(
+            ["--processes", str(processes)]
+        )
+        results[processes] = list(app.parse_files(iter(files)))
+
+    assert results[1] == results[2]
+    assert [summary["assembly_ID"] for _, summary in results[2]] == [
+        f"GCA_{i:09d}" for i in range(1, 13)
+    ]
+    assert all(len(output) == 4 for output, _ in results[2])
@@ -12,6 +12,9 @@ from src.processor import Processor
         ("GCA_002905295_annotations.gff", "GCA_002905295"),
         ("ERZ25456556_annotations.gff.gz", "ERZ25456556"),
         ("ERZ25456556_annotations.gff", "ERZ25456556"),
+        ("GCA_002905295.1_amrfinderplus.gff.gz", "GCA_002905295.1"),
+        ("GCA_002905295.1.gff", "GCA_002905295.1"),
+        ("/path/to/GCA_002905295.1_annotations.gff.gz", "GCA_002905295.1"),
     ],
 )
 def test_gca_parsing(file, expected):
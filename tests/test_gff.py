@@ -0,0 +1,89 @@
+import io
+import pytest
+from pathlib import Path
+from src.gff import parse_gff, parse_attributes
+
+example_gff = (
+    "##gff-version 3\n"
+    "##sequence-region chr1 1 1000\n"
+    "chr1\tsrc\tgene\t1\t100\t.\t+\t.\tID=g1\n"
+    "chr1\tsrc\tCDS\t1\t100\t.\t+\t0\tID=c1;Parent=g1;element_type=AMR\n"
+    "chr2\tsrc\tCDS\t5\t50\t0.5\t-\t0\tID=c2;Name=y%3Bz\n"
+    "##FASTA\n"
+    ">chr1\n"
+    "ACGT\n"
+)
+
+
+@pytest.mark.parametrize(
+    "column,expected",
+    [
+        ("ID=c1", {"ID": ["c1"]}),
+        ("ID=c1;", {"ID": ["c1"]}),
+        ("inference=a,b,,c", {"inference": ["a", "b", "c"]}),
+        ("Name=y%3Bz%2Cq", {"Name": ["y;z,q"]}),
+        ("flag;empty=", {"flag": ["true"], "empty": ["true"]}),
+        ("note=a;note=b", {"note": ["a", "b"]}),
+    ],
+)
+def test_parse_attributes(column, expected):
+    assert parse_attributes(column) == expected
+
+
+def test_parse_gff_filters_type_and_stops_at_fasta():
+    features = list(parse_gff(io.StringIO(example_gff), gff_type="CDS"))
+    assert [f.id for f in features] == ["c1", "c2"]
+    f = features[1]
+    assert f.seqid == "chr2"
+    assert f.start == 5
+    assert f.end == 50
+    assert f.score == "0.5"
+    assert f.strand == "-"
+    assert f.attributes["Name"] == ["y;z"]
+
+
+def test_parse_gff_contains():
+    features = list(
+        parse_gff(io.StringIO(example_gff), gff_type="CDS", contains="element_type")
+    )
+    assert [f.id for f in features] == ["c1"]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, len(example_gff)])
+def test_parse_gff_block_boundaries(block_size):
+    features = list(parse_gff(io.StringIO(example_gff), block_size=block_size))
+    assert [f.id for f in features] == ["g1", "c1", "c2"]
+    assert features[2].attributes["Name"] == ["y;z"]
+
+
+def test_parse_gff_no_trailing_newline():
+    gff = (
+        "chr1\tsrc\tCDS\t1\t100\t.\t+\t0\tID=c1\r\n"
+        "chr1\tsrc\tCDS\t5\t9\t.\t-\t0\tID=c2"
+    )
+    features = list(parse_gff(io.StringIO(gff, newline="")))
+    assert [f.id for f in features] == ["c1", "c2"]
+    assert features[1].end == 9
+
+
+def test_parse_gff_all_types():
+    features = list(parse_gff(io.StringIO(example_gff)))
+    assert [f.type for f in features] == ["gene", "CDS", "CDS"]
+    assert features[0].phase is None
+
+
+def test_parse_gff_file():
+    gff = (
+        Path(__file__).resolve().parent / "test_data" / "GCA_000091005_annotations.gff"
+    )
+    with open(gff, "rt") as fh:
+        features = [
+            f
+            for f in parse_gff(fh, gff_type="CDS")
+            if "amrfinderplus_element_symbol" in f.attributes
+            and f.attributes["element_type"][0] == "AMR"
+        ]
+    assert len(features) == 4
+    assert features[-1].seqid == "AP010955.1"
+    assert features[-1].start == 3706
+    assert features[-1].end == 4521